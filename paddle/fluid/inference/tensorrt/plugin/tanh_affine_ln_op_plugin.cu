@@ -0,0 +1,193 @@
+// Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <cstring>
+
+#include "glog/logging.h"
+#include "paddle/fluid/inference/tensorrt/plugin/tanh_affine_ln_op_plugin.h"
+
+namespace paddle {
+namespace inference {
+namespace tensorrt {
+namespace plugin {
+
+__global__ void tanh_affine_ln_kernel(int64_t n,
+                                      int64_t inner,
+                                      const float* input,
+                                      const float* scale,
+                                      const float* bias,
+                                      float* output) {
+  const int64_t idx =
+      static_cast<int64_t>(blockIdx.x) * blockDim.x + threadIdx.x;
+  if (idx < n) {
+    const int64_t c = idx % inner;
+    output[idx] = fmaf(scale[c], tanhf(input[idx]), bias[c]);
+  }
+}
+
+__global__ void tanh_affine_ln_kernel(int64_t n,
+                                      int64_t inner,
+                                      const half* input,
+                                      const half* scale,
+                                      const half* bias,
+                                      half* output) {
+#if CUDA_ARCH_FP16_SUPPORTED(__CUDA_ARCH__)
+  const int64_t idx =
+      static_cast<int64_t>(blockIdx.x) * blockDim.x + threadIdx.x;
+  if (idx < n) {
+    const int64_t c = idx % inner;
+    const float x = __half2float(input[idx]);
+    output[idx] = __float2half(
+        fmaf(__half2float(scale[c]), tanhf(x), __half2float(bias[c])));
+  }
+#endif
+}
+
+// Each thread handles two adjacent elements, n and inner count half2 pairs.
+__global__ void tanh_affine_ln_half2_kernel(int64_t n,
+                                            int64_t inner,
+                                            const half2* input,
+                                            const half2* scale,
+                                            const half2* bias,
+                                            half2* output) {
+#if CUDA_ARCH_FP16_SUPPORTED(__CUDA_ARCH__)
+  const int64_t idx =
+      static_cast<int64_t>(blockIdx.x) * blockDim.x + threadIdx.x;
+  if (idx < n) {
+    const int64_t c = idx % inner;
+    const float2 x = __half22float2(input[idx]);
+    const float2 s = __half22float2(scale[c]);
+    const float2 b = __half22float2(bias[c]);
+    output[idx] = __floats2half2_rn(fmaf(s.x, tanhf(x.x), b.x),
+                                    fmaf(s.y, tanhf(x.y), b.y));
+  }
+#endif
+}
+
+nvinfer1::DimsExprs PIRTanhAffineLnPlugin::getOutputDimensions(
+    int output_index,
+    const nvinfer1::DimsExprs* inputs,
+    int nb_inputs,
+    nvinfer1::IExprBuilder& expr_builder) TRT_NOEXCEPT {
+  return inputs[0];
+}
+
+bool PIRTanhAffineLnPlugin::supportsFormatCombination(
+    int pos,
+    const nvinfer1::PluginTensorDesc* in_out,
+    int nb_inputs,
+    int nb_outputs) TRT_NOEXCEPT {
+  PADDLE_ENFORCE_NOT_NULL(
+      in_out,
+      common::errors::InvalidArgument(
+          "The input of tanh_affine_ln plugin should not be nullptr."));
+
+  PADDLE_ENFORCE_LT(
+      pos,
+      nb_inputs + nb_outputs,
+      common::errors::InvalidArgument("The pos(%d) should be less than the "
+                                      "num(%d) of the input and the output.",
+                                      pos,
+                                      nb_inputs + nb_outputs));
+
+  const nvinfer1::PluginTensorDesc& in = in_out[pos];
+  if (pos == 0) {
+    return (in.type == nvinfer1::DataType::kFLOAT ||
+            in.type == nvinfer1::DataType::kHALF) &&
+           (in.format == nvinfer1::TensorFormat::kLINEAR);
+  }
+  // scale, bias and the output follow the type of x
+  return in.type == in_out[0].type && in.format == in_out[0].format;
+}
+
+nvinfer1::DataType PIRTanhAffineLnPlugin::getOutputDataType(
+    int index,
+    const nvinfer1::DataType* input_types,
+    int nb_inputs) const TRT_NOEXCEPT {
+  PADDLE_ENFORCE_EQ(index,
+                    0,
+                    common::errors::InvalidArgument(
+                        "The tanh_affine_ln Plugin only has one output, so "
+                        "the index value should be 0, but get %d.",
+                        index));
+  return input_types[0];
+}
+
+int PIRTanhAffineLnPlugin::enqueue(
+    const nvinfer1::PluginTensorDesc* input_desc,
+    const nvinfer1::PluginTensorDesc* output_desc,
+    const void* const* inputs,
+    void* const* outputs,
+    void* workspace,
+    cudaStream_t stream) TRT_NOEXCEPT {
+  const int64_t num = ProductDim(input_desc[0].dims);
+  const int64_t inner = ProductDim(input_desc[1].dims);
+  PADDLE_ENFORCE_EQ(
+      inner,
+      static_cast<int64_t>(ProductDim(input_desc[2].dims)),
+      common::errors::InvalidArgument(
+          "The scale and bias of tanh_affine_ln plugin should have the same "
+          "number of elements, but got %d and %d.",
+          inner,
+          ProductDim(input_desc[2].dims)));
+  if (num == 0) {
+    return cudaGetLastError() != cudaSuccess;
+  }
+  const int block_size = 256;
+
+  auto input_type = input_desc[0].type;
+  if (input_type == nvinfer1::DataType::kFLOAT) {
+    VLOG(1) << "TRT Plugin DataType selected. TanhAffineLn-->fp32";
+    const int64_t grid_size = (num + block_size - 1) / block_size;
+    tanh_affine_ln_kernel<<<grid_size, block_size, 0, stream>>>(
+        num,
+        inner,
+        static_cast<const float*>(inputs[0]),
+        static_cast<const float*>(inputs[1]),
+        static_cast<const float*>(inputs[2]),
+        static_cast<float*>(outputs[0]));
+  } else if (input_type == nvinfer1::DataType::kHALF) {
+    if (inner % 2 == 0) {
+      VLOG(1) << "TRT Plugin DataType selected. TanhAffineLn-->fp16x2";
+      const int64_t grid_size = (num / 2 + block_size - 1) / block_size;
+      tanh_affine_ln_half2_kernel<<<grid_size, block_size, 0, stream>>>(
+          num / 2,
+          inner / 2,
+          static_cast<const half2*>(inputs[0]),
+          static_cast<const half2*>(inputs[1]),
+          static_cast<const half2*>(inputs[2]),
+          static_cast<half2*>(outputs[0]));
+    } else {
+      VLOG(1) << "TRT Plugin DataType selected. TanhAffineLn-->fp16";
+      const int64_t grid_size = (num + block_size - 1) / block_size;
+      tanh_affine_ln_kernel<<<grid_size, block_size, 0, stream>>>(
+          num,
+          inner,
+          static_cast<const half*>(inputs[0]),
+          static_cast<const half*>(inputs[1]),
+          static_cast<const half*>(inputs[2]),
+          static_cast<half*>(outputs[0]));
+    }
+  } else {
+    PADDLE_THROW(common::errors::InvalidArgument(
+        "The tanh_affine_ln TRT Plugin's input type should be float or "
+        "half."));
+  }
+  return cudaGetLastError() != cudaSuccess;
+}
+
+}  // namespace plugin
+}  // namespace tensorrt
+}  // namespace inference
+}  // namespace paddle
@@ -470,6 +470,7 @@ class PaddleToTensorRTConverter:
                 config.set_flag(trt.BuilderFlag.PREFER_PRECISION_CONSTRAINTS)
 
         trt_engine = builder.build_serialized_network(network, config)
+        constant_manager.clear_engine_weights()
         assert (
             trt_engine is not None
         ), 'Failed to build engine. please see ERROR log from trt.Logger'
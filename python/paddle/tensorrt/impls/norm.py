@@ -21,8 +21,103 @@ from paddle.tensorrt.converter_utils import (
     get_dynamic_dims,
     get_trt_plugin,
     has_dynamic_shape,
+    trt_prod,
+    trt_sum,
 )
 from paddle.tensorrt.register import converter_registry
+from paddle.tensorrt.util import TensorRTConstantManager
+
+
+def _fold_bn_weights(mean, variance, scale, bias, eps):
+    # The weights returned by numpy() share memory with the constants of
+    # the program, so only write into freshly allocated arrays.
+    actual_scale_np = np.add(variance.numpy(), eps)
+    np.sqrt(actual_scale_np, out=actual_scale_np)
+    np.reciprocal(actual_scale_np, out=actual_scale_np)
+    np.multiply(scale.numpy(), actual_scale_np, out=actual_scale_np)
+    actual_bias_np = np.multiply(mean.numpy(), actual_scale_np)
+    np.subtract(bias.numpy(), actual_bias_np, out=actual_bias_np)
+    return actual_scale_np, actual_bias_np
+
+
+def _fuse_bn_into_conv(
+    network, paddle_op, input_tensor, actual_scale_np, actual_bias_np
+):
+    # Only a conv2d whose output is consumed by this batch_norm alone can
+    # absorb the BN, otherwise the other consumers would see the BN result.
+    input_value = paddle_op.operands()[0].source()
+    if input_value.get_defining_op().name() not in (
+        "pd_op.conv2d",
+        "pd_op.depthwise_conv2d",
+    ):
+        return False
+    if len(input_value.all_used_ops()) != 1:
+        return False
+    if network.num_layers == 0:
+        return False
+    conv_layer = network.get_layer(network.num_layers - 1)
+    if (
+        conv_layer.type != trt.LayerType.CONVOLUTION
+        or conv_layer.get_output(0).name != input_tensor.name
+    ):
+        return False
+    conv_layer.__class__ = trt.IConvolutionLayer
+
+    kernel_np = np.asarray(conv_layer.kernel)
+    if kernel_np.size == 0 or kernel_np.dtype != actual_scale_np.dtype:
+        return False
+    n_output = conv_layer.num_output_maps
+    if actual_scale_np.size != n_output:
+        return False
+
+    # convert_conv2d builds the conv without a bias, so W' = W * scale along
+    # the output channel axis and b' = bias.
+    channel_scale_np = actual_scale_np.reshape(n_output, 1)
+    fused_kernel_np = kernel_np.reshape(n_output, -1) * channel_scale_np
+    fused_kernel_np = fused_kernel_np.reshape(kernel_np.shape)
+    fused_bias_np = actual_bias_np.reshape(n_output)
+    TensorRTConstantManager().add_engine_weights(fused_kernel_np, fused_bias_np)
+    conv_layer.kernel = fused_kernel_np
+    conv_layer.bias = fused_bias_np
+    return True
+
+
+def _tanh_affine_ln_plugin_available():
+    plugin_creator = trt.get_plugin_registry().get_plugin_creator(
+        "tanh_affine_ln", "1", ""
+    )
+    return plugin_creator is not None
+
+
+def _tanh_affine_ln(network, paddle_op, input_a, scale, bias, begin_norm_axis):
+    rank = len(input_a.shape)
+    if begin_norm_axis < 0:
+        begin_norm_axis += rank
+    # scale and bias hold prod(normalized_shape) elements, lay them out as the
+    # trailing dims of x so that they broadcast from begin_norm_axis on.
+    norm_shape = tuple(
+        paddle_op.operands()[0].source().shape[begin_norm_axis:]
+    )
+    assert not has_dynamic_shape(
+        norm_shape
+    ), "The normalized dims of layer_norm can't be dynamic."
+    broadcast_shape = (1,) * begin_norm_axis + norm_shape
+    scale_tensor = network.add_constant(broadcast_shape, scale).get_output(0)
+    bias_tensor = network.add_constant(broadcast_shape, bias).get_output(0)
+
+    # Prefer the fused plugin, which reads x and writes y only once.
+    if _tanh_affine_ln_plugin_available():
+        plugin = get_trt_plugin(
+            "tanh_affine_ln", trt.PluginFieldCollection([]), "1"
+        )
+        tanh_affine_layer = network.add_plugin_v2(
+            [input_a, scale_tensor, bias_tensor], plugin
+        )
+        return tanh_affine_layer.get_output(0)
+
+    tanh_layer = network.add_activation(input_a, trt.ActivationType.TANH)
+    scaled_tensor = trt_prod(network, tanh_layer.get_output(0), scale_tensor)
+    return trt_sum(network, scaled_tensor, bias_tensor)
 
 
 @converter_registry.register(
@@ -34,28 +129,41 @@ def layernorm_converter(network, paddle_op, inputs):
     begin_norm_axis = paddle_op.attrs().get("begin_norm_axis", 0)
     epsilon = paddle_op.attrs().get("epsilon", 1e-5)
     assert len(paddle_op.operands()) == 3
+
+    # Opt-in substitute of LayerNorm by Y = W * tanh(X) + B, which drops the
+    # mean/variance reduction. Only valid for models trained with it.
+    if paddle_op.attrs().get("use_tanh_ln_substitute", False):
+        return _tanh_affine_ln(
+            network, paddle_op, input_a, scale, bias, begin_norm_axis
+        )
+
     scale_shape = paddle_op.operands()[1].source().shape
 
     scale_tensor = network.add_constant(scale_shape, scale).get_output(0)
     bias_shape = paddle_op.operands()[2].source().shape
     bias_tensor = network.add_constant(bias_shape, bias).get_output(0)
 
+    rank = len(input_a.shape)
     # dims = list(range( len(input_a.shape) - len(normalized_shape), len(input_a.shape)))
-    dims = list(range(len(input_a.shape)))[begin_norm_axis:]
+    if begin_norm_axis < 0:
+        begin_norm_axis += rank
+    dims = tuple(range(begin_norm_axis, rank))
     axes = get_axes_for_reduce_op(dims)
 
+    scale_num_prepend_ones = rank - len(scale_tensor.shape)
+    bias_num_prepend_ones = rank - len(bias_tensor.shape)
     scale_tensor = append_ones(
         network,
         scale_tensor,
         f"{scale_tensor.name}_broadcast",
-        len(input_a.shape) - len(scale_tensor.shape),
+        scale_num_prepend_ones,
     )
 
     bias_tensor = append_ones(
         network,
         bias_tensor,
         f"{bias_tensor.name}_broadcast",
-        len(input_a.shape) - len(bias_tensor.shape),
+        bias_num_prepend_ones,
     )
 
     layer_norm = network.add_normalization(
@@ -75,19 +183,16 @@ def layernorm_converter(network, paddle_op, inputs):
 )
 def batch_norm_converter(network, paddle_op, inputs):
     input_tensor, mean, variance, scale, bias = inputs
-    scale_shape = paddle_op.operands()[3].source().shape
     eps = paddle_op.attrs().get("epsilon", 1e-8)
-    mean_np = mean.numpy()
-    variance_np = variance.numpy()
-    scale_np = scale.numpy()
-    bias_np = bias.numpy()
-
-    actual_scale_np = scale_np / np.sqrt(variance_np + eps)
-    actual_bias_np = bias_np - mean_np * actual_scale_np
+    actual_scale_np, actual_bias_np = _fold_bn_weights(
+        mean, variance, scale, bias, eps
+    )
+    if len(input_tensor.shape) == 4 and _fuse_bn_into_conv(
+        network, paddle_op, input_tensor, actual_scale_np, actual_bias_np
+    ):
+        return input_tensor
     bias = trt.Weights(actual_bias_np)
     scale = trt.Weights(actual_scale_np)
-    power = np.ones(scale_shape, dtype='float32')
-    power = trt.Weights(power)
     input_tensor_shape = paddle_op.operands()[0].source().shape
     if has_dynamic_shape(input_tensor_shape):
         assert (
@@ -95,8 +200,14 @@ def batch_norm_converter(network, paddle_op, inputs):
         ), "Channel dim can't be dynamic for batch norm."
     # For BatchNorm1d ,reshape 1d to 2d
     output_shape = input_tensor_shape
+    # Decide on the rank of the TensorRT tensor actually fed in, a producer
+    # that already emits a 4-D tensor needs neither of the two shuffles.
+    need_reshape = (
+        not network.has_implicit_batch_dimension
+        and len(input_tensor.shape) < 4
+    )
 
-    if not network.has_implicit_batch_dimension and len(input_tensor_shape) < 4:
+    if need_reshape:
         assert (
             len(get_dynamic_dims(input_tensor.shape)) <= 1
         ), "BatchNorm1D with more than one dynamic dims is not currently supported."
@@ -117,11 +228,12 @@ def batch_norm_converter(network, paddle_op, inputs):
             )
         input_tensor = reshape_layer.get_output(0)
     # (self: tensorrt.tensorrt.INetworkDefinition, input: tensorrt.tensorrt.ITensor, mode: tensorrt.tensorrt.ScaleMode, shift: tensorrt.tensorrt.Weights = None, scale: tensorrt.tensorrt.Weights = None, power: tensorrt.tensorrt.Weights = None) -> tensorrt.tensorrt.IScaleLayer
+    # power is left empty, TensorRT treats it as 1 and skips the pow.
     batch_norm_layer = network.add_scale(
-        input_tensor, trt.ScaleMode.CHANNEL, bias, scale, power
+        input_tensor, trt.ScaleMode.CHANNEL, bias, scale, None
     )
     # For BatchNorm1d,reshape output back to 1d
-    if not network.has_implicit_batch_dimension and len(output_shape) < 4:
+    if need_reshape:
         reshape_output_layer = network.add_shuffle(
             batch_norm_layer.get_output(0)
         )
@@ -468,15 +468,13 @@ def affine_channel_converter(network, paddle_op, inputs):
             f"affine_channel: scale.size({scale_weights.size}) != bias.size({bias_weights.size})"
         )
 
-    power_array = np.ones((scale_weights.size,), dtype=np.float32)
-    power_weights = trt.Weights(power_array)
-
+    # power is left empty, TensorRT treats it as 1 and skips the pow.
     layer = network.add_scale_nd(
         input=x_input,
         mode=trt.ScaleMode.CHANNEL,
         shift=bias_weights,
         scale=scale_weights,
-        power=power_weights,
+        power=None,
         channel_axis=channel_axis,
     )
     if not layer:
@@ -246,6 +246,7 @@ class TensorRTConstantManager:
         if not cls._instance:
             cls._instance = super().__new__(cls)
             cls._instance.constant_dict = {}
+            cls._instance.engine_weights = []
         return cls._instance
 
     def set_constant_value(self, name, tensor_data, value):
@@ -260,6 +261,14 @@ class TensorRTConstantManager:
     def get_constant_value(self, name):
         return self.constant_dict[name]
 
+    # Arrays created by converters and handed to TensorRT layers are not
+    # copied until the engine is built, keep them referenced until then.
+    def add_engine_weights(self, *arrays):
+        self.engine_weights.extend(arrays)
+
+    def clear_engine_weights(self):
+        self.engine_weights.clear()
+
 
 # In TensorRT FP16 inference, this function sets the precision of specific
 # operators to FP32, ensuring numerical accuracy for these operations.
@@ -13,11 +13,14 @@
 # limitations under the License.
 
 import unittest
+from unittest import mock
 
 import numpy as np
+import tensorrt as trt
 from tensorrt_test_base import TensorRTBaseTest
 
 import paddle
+from paddle.tensorrt.impls import norm as norm_impls
 
 
 def batch_norm_wrapper(x):
@@ -40,6 +43,148 @@ class TestBatchNormTRTPattern(TensorRTBaseTest):
         self.check_trt_result()
 
 
+def conv2d_batch_norm_wrapper(x):
+    # without a conv bias, batch_norm consumes pd_op.conv2d directly
+    conv = paddle.nn.Conv2D(3, 4, (3, 3), bias_attr=False)
+    # per-channel statistics, so that a wrong fold changes the result
+    mean, variance, weight, bias = (
+        paddle.create_parameter(
+            [4],
+            "float32",
+            default_initializer=paddle.nn.initializer.Assign(
+                np.array(value, dtype="float32")
+            ),
+        )
+        for value in (
+            [0.5, -0.3, 0.1, -0.8],
+            [0.25, 1.5, 0.6, 2.0],
+            [1.5, -0.7, 0.3, 2.2],
+            [0.2, -0.4, 0.9, -1.1],
+        )
+    )
+    return paddle.nn.functional.batch_norm(
+        conv(x), mean, variance, weight, bias, training=False
+    )
+
+
+class TestConv2dBatchNormTRTPattern(TensorRTBaseTest):
+    def setUp(self):
+        self.python_api = conv2d_batch_norm_wrapper
+        self.api_args = {
+            "x": np.random.random([2, 3, 8, 8]).astype("float32"),
+        }
+        self.program_config = {"feed_list": ["x"]}
+        self.min_shape = {"x": [1, 3, 8, 8]}
+        self.opt_shape = {"x": [2, 3, 8, 8]}
+        self.max_shape = {"x": [5, 3, 8, 8]}
+        self.disable_passes = [
+            'constant_folding_pass',
+            'conv2d_add_fuse_pass',
+            'conv2d_bn_fuse_pass',
+        ]
+
+    def test_trt_result(self):
+        fuse_bn_into_conv = norm_impls._fuse_bn_into_conv
+        fuse_results = []
+        networks = []
+
+        def record_fuse_bn_into_conv(network, *args):
+            networks.append(network)
+            fuse_results.append(fuse_bn_into_conv(network, *args))
+            return fuse_results[-1]
+
+        with mock.patch.object(
+            norm_impls, "_fuse_bn_into_conv", new=record_fuse_bn_into_conv
+        ):
+            self.check_trt_result()
+
+        # batch_norm must be folded into the conv, not lowered to a scale
+        self.assertEqual(fuse_results, [True])
+        for network in networks:
+            for i in range(network.num_layers):
+                self.assertNotEqual(
+                    network.get_layer(i).type, trt.LayerType.SCALE
+                )
+
+
+def tanh_layer_norm_wrapper(x, normalized_shape, weight, bias):
+    layer_norm = paddle.nn.LayerNorm(
+        normalized_shape,
+        weight_attr=paddle.ParamAttr(
+            initializer=paddle.nn.initializer.Assign(weight)
+        ),
+        bias_attr=paddle.ParamAttr(
+            initializer=paddle.nn.initializer.Assign(bias)
+        ),
+    )
+    out = layer_norm(x)
+    out.get_defining_op().set_bool_attr("use_tanh_ln_substitute", True)
+    return out
+
+
+class TanhLayerNormTRTTestBase(TensorRTBaseTest):
+    def set_shape(self, shape, begin_norm_axis):
+        normalized_shape = shape[begin_norm_axis:]
+        self.python_api = tanh_layer_norm_wrapper
+        self.api_args = {
+            "x": np.random.uniform(-2, 2, shape).astype("float32"),
+            "normalized_shape": normalized_shape,
+            "weight": np.random.random(np.prod(normalized_shape)).astype(
+                "float32"
+            ),
+            "bias": np.random.random(np.prod(normalized_shape)).astype(
+                "float32"
+            ),
+        }
+        self.program_config = {"feed_list": ["x"]}
+        self.min_shape = {"x": [1, *shape[1:]]}
+        self.opt_shape = {"x": shape}
+        self.max_shape = {"x": [5, *shape[1:]]}
+
+    def run_program(self, main_program, fetch_list):
+        # Paddle runs the real layer_norm, so the engine is compared against
+        # the substitute computed with numpy.
+        ops = main_program.global_block().ops
+        if any(op.name() == "pd_op.tensorrt_engine" for op in ops):
+            return super().run_program(main_program, fetch_list)
+        normalized_shape = self.api_args["normalized_shape"]
+        weight = self.api_args["weight"].reshape(normalized_shape)
+        bias = self.api_args["bias"].reshape(normalized_shape)
+        return [weight * np.tanh(self.api_args["x"]) + bias]
+
+
+class TestTanhLayerNormFallbackTRTPattern(TanhLayerNormTRTTestBase):
+    def setUp(self):
+        # normalize over the last two axes
+        self.set_shape([2, 3, 4, 6], begin_norm_axis=2)
+
+    def test_trt_result(self):
+        with mock.patch.object(
+            norm_impls, "_tanh_affine_ln_plugin_available", return_value=False
+        ):
+            self.check_trt_result()
+
+
+class TestTanhLayerNormPluginTRTPattern(TanhLayerNormTRTTestBase):
+    def setUp(self):
+        # an even normalized size takes the half2 kernel in fp16
+        self.set_shape([2, 3, 4, 6], begin_norm_axis=2)
+
+    def test_trt_result(self):
+        self.assertTrue(norm_impls._tanh_affine_ln_plugin_available())
+        self.check_trt_result()
+
+    def test_trt_result_fp16(self):
+        self.check_trt_result(rtol=1e-2, atol=1e-2, precision_mode="fp16")
+
+
+class TestTanhLayerNormPluginOddSizeTRTPattern(
+    TestTanhLayerNormPluginTRTPattern
+):
+    def setUp(self):
+        self.set_shape([2, 3, 5], begin_norm_axis=2)
+
+
 def instance_norm_wrapper(x, weight, bias):
     return paddle.nn.functional.instance_norm(x, None, None, weight, bias)
 
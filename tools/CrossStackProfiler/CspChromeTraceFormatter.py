@@ -77,6 +77,28 @@ class ChromeTraceFormatter:
         event['args'] = args
         self._events.append(event)
 
+    def emit_regions(self, records):
+        """Adds a batch of region events to the trace.
+
+        Args:
+          records:  An iterable of (timestamp, duration, pid, tid, category,
+            name, args) tuples, with the same meaning as in emit_region.
+        """
+        append = self._events.append
+        for timestamp, duration, pid, tid, category, name, args in records:
+            append(
+                {
+                    'ph': 'X',
+                    'cat': category,
+                    'name': name,
+                    'pid': pid,
+                    'tid': tid,
+                    'ts': timestamp,
+                    'dur': duration,
+                    'args': args,
+                }
+            )
+
     def emit_counter(self, category, name, pid, timestamp, counter, value):
         """Emits a record for a single counter.
 
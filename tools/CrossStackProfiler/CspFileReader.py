@@ -87,6 +87,10 @@ class FileReader:
         self._organizeForm = FILEORGANIZEFORM_BYOTHER
         self._gpuPerTrainer = 0
 
+        # file name and group id lookups are stable, cache them per reader
+        self._rankIdCache = {}
+        self._fileListCache = {}
+
         self._checkArgs()
         self._getFileList()
 
@@ -144,6 +148,13 @@ class FileReader:
         self._checkArgsKey("minTimeStamp", int)
 
     def getFileListByGroup(self, groupId):
+        fileList = self._fileListCache.get(groupId)
+        if fileList is None:
+            fileList = self._getFileListByGroup(groupId)
+            self._fileListCache[groupId] = fileList
+        return fileList
+
+    def _getFileListByGroup(self, groupId):
         lIndex = 0
         rIndex = 0
 
@@ -232,7 +243,11 @@ class FileReader:
             )
 
     def getRankId(self, fileName, sed="."):
-        return self._getId(fileName, FILEORGANIZEFORM_BYRANK, sed)
+        rankId = self._rankIdCache.get((fileName, sed))
+        if rankId is None:
+            rankId = self._getId(fileName, FILEORGANIZEFORM_BYRANK, sed)
+            self._rankIdCache[(fileName, sed)] = rankId
+        return rankId
 
     def getRankNum(self):
         if self._organizeForm == FILEORGANIZEFORM_BYRANK:
@@ -14,8 +14,10 @@
 
 import json
 import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Process
 
+import numpy as np
 from CspChromeTraceFormatter import ChromeTraceFormatter
 from CspFileReader import (
     DCGMINFO_TRACE_NUM,
@@ -29,8 +31,57 @@ from CspFileReader import (
 from paddle.base.proto.profiler import profiler_pb2
 
 
+_FB_NAME = "marker/compute/MarkerCUDA"
+_FB_MARKERS = frozenset(
+    {
+        "marker_forward_B",
+        "marker_forward_E",
+        "marker_backward_B",
+        "marker_backward_E",
+    }
+)
+
+_pipeLineInfoReader = None
+
+
+def _initPipeLineInfoWorker(reader):
+    global _pipeLineInfoReader
+    _pipeLineInfoReader = reader
+
+
+def _getPipeLineInfoWorker(taskList):
+    return _pipeLineInfoReader._getPipeLineInfo(taskList)
+
+
 class profileFileReader(FileReader):
-    def _parseSingleFile(self, profile):
+    def __init__(self, logger, args):
+        super().__init__(logger, args)
+        # id(profile_pb) -> (profile_pb, fields extracted by _extract_events)
+        self._eventsCache = {}
+
+    def _extract_events(self, profile_pb):
+        cached = self._eventsCache.get(id(profile_pb))
+        if cached is not None and cached[0] is profile_pb:
+            return cached[1]
+
+        # Every attribute access on a protobuf event crosses into C, read
+        # each field once and share the lists between the passes.
+        events = profile_pb.events
+        fields = (
+            [event.type for event in events],
+            [event.device_id for event in events],
+            [event.start_ns for event in events],
+            [event.end_ns for event in events],
+            [event.name for event in events],
+            [event.memcopy.bytes for event in events],
+            [event.sub_device_id for event in events],
+            [getattr(event, "detail_info", "") for event in events],
+        )
+        self._eventsCache[id(profile_pb)] = (profile_pb, fields)
+        return fields
+
+    @staticmethod
+    def _parseSingleFile(profile):
         with open(profile, 'rb') as f:
             profile_s = f.read()
             profile_pb = profiler_pb2.Profile()
@@ -41,42 +92,39 @@ class profileFileReader(FileReader):
     def _parseTask(self, taskList, q=None):
         profile_dict = {}
 
-        for fileName in taskList:
-            rankId = self.getRankId(fileName)
-            profile_dict[f"trainerRank.{rankId:03}"] = self._parseSingleFile(
-                fileName
+        # ParseFromString holds the GIL, so the only gain is that reading
+        # the next file overlaps with parsing the current one. Two threads
+        # are enough for that and don't oversubscribe the GPU processes.
+        maxWorkers = max(1, min(len(taskList), 2))
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            profileList = executor.map(
+                profileFileReader._parseSingleFile, taskList
             )
-            self._logger.info(f"I finish processing {fileName}!")
+            for fileName, profile_pb in zip(taskList, profileList):
+                rankId = self.getRankId(fileName)
+                profile_dict[f"trainerRank.{rankId:03}"] = profile_pb
+                self._logger.info(f"I finish processing {fileName}!")
 
         if q is not None:
             q.put(profile_dict)
 
         return profile_dict
 
-    def _is_forwardBackwardInfo(self, items):
-        if items["name"] == "marker/compute/MarkerCUDA":
-            if "args" in items:
-                if isinstance(items["args"], dict):
-                    args = items["args"]
-                    if "detail_info" in args:
-                        if (
-                            args["detail_info"] == "marker_forward_B"
-                            or args["detail_info"] == "marker_forward_E"
-                            or args["detail_info"] == "marker_backward_B"
-                            or args["detail_info"] == "marker_backward_E"
-                        ):
-                            return True
-        return False
-
     def _allocate_forwardBackwardInfo(self, restList, pid, tid):
-        def _cmp_ele(items):
-            return items["ts"]
-
-        restList.sort(key=_cmp_ele)
         newList = []
+        if not restList:
+            return newList
+
+        ts = np.fromiter(
+            (items["ts"] for items in restList),
+            dtype=np.int64,
+            count=len(restList),
+        )
+        order = np.argsort(ts, kind='stable')
 
         lastEle = {}
-        for items in restList:
+        for idx in order.tolist():
+            items = restList[idx]
             if items["args"]["detail_info"].endswith("E"):
                 if not lastEle:
                     continue
@@ -113,11 +161,18 @@ class profileFileReader(FileReader):
             tid = rankId
 
             for event in profile_pb.events:
+                # Only the forward/backward markers are kept, filter on the
+                # raw event before building any dict for it.
+                if event.name != _FB_NAME:
+                    continue
+                detail_info = getattr(event, "detail_info", "")
+                if detail_info not in _FB_MARKERS:
+                    continue
+
                 args = {'name': event.name}
                 if event.memcopy.bytes > 0:
                     args['mem_bytes'] = event.memcopy.bytes
-                if hasattr(event, "detail_info") and event.detail_info:
-                    args['detail_info'] = event.detail_info
+                args['detail_info'] = detail_info
 
                 traceEvent = {}
                 traceEvent['ph'] = 'X'
@@ -128,9 +183,7 @@ class profileFileReader(FileReader):
                 traceEvent['ts'] = self._align_ts(event.start_ns)
                 traceEvent['dur'] = (event.end_ns - event.start_ns) / 1.0
                 traceEvent['args'] = args
-
-                if self._is_forwardBackwardInfo(traceEvent):
-                    traceEventList.append(traceEvent)
+                traceEventList.append(traceEvent)
 
             pipeLineList = self._allocate_forwardBackwardInfo(
                 traceEventList, pid, tid
@@ -149,35 +202,6 @@ class profileFileReader(FileReader):
         self._logger.info(
             f"using [{processNum}] process to do this work, total task num is {len(fileFist)}!"
         )
-        processPool = []
-        pidList = []
-
-        manager = multiprocessing.Manager()
-        q = manager.Queue()
-
-        taskList = self._splitTaskListForMultiProcess(fileFist, processNum)
-        for task in taskList:
-            subproc = Process(
-                target=self._getPipeLineInfo,
-                args=(
-                    task,
-                    q,
-                ),
-            )
-            processPool.append(subproc)
-            subproc.start()
-            pidList.append(subproc.pid)
-            self._logger.info(
-                f"[pipeline info]: process [{subproc.pid}] has been started, total task num is {len(task)} ..."
-            )
-
-        for t in processPool:
-            t.join()
-            pidList.remove(t.pid)
-            self._logger.info(
-                f"[pipeline info]: process [{t.pid}] has exited! remained {len(pidList)} process!"
-            )
-
         pipeLineInfo = {}
 
         metaInfo = {}
@@ -186,13 +210,27 @@ class profileFileReader(FileReader):
         metaInfo['pid'] = 0
         metaInfo['args'] = {'name': f"{PIPELINEINFO_TRACE_NUM:02}_pipeLineInfo"}
 
-        for t in processPool:
-            for k, v in q.get().items():
-                rankId = int(k)
-                gpuId = rankId % self._gpuPerTrainer
-                if str(gpuId) not in pipeLineInfo.keys():
-                    pipeLineInfo[str(gpuId)] = [metaInfo]
-                pipeLineInfo[str(gpuId)].extend(v)
+        taskList = self._splitTaskListForMultiProcess(fileFist, processNum)
+        if not taskList:
+            return pipeLineInfo
+
+        # The results come back through the pool's own pipe, no Manager
+        # server process is needed to relay them.
+        with multiprocessing.Pool(
+            processes=len(taskList),
+            initializer=_initPipeLineInfoWorker,
+            initargs=(self,),
+        ) as pool:
+            for res in pool.imap_unordered(_getPipeLineInfoWorker, taskList):
+                for k, v in res.items():
+                    rankId = int(k)
+                    gpuId = rankId % self._gpuPerTrainer
+                    if str(gpuId) not in pipeLineInfo.keys():
+                        pipeLineInfo[str(gpuId)] = [metaInfo]
+                    pipeLineInfo[str(gpuId)].extend(v)
+                self._logger.info(
+                    f"[pipeline info]: a task of [{len(res)}] files has finished!"
+                )
 
         return pipeLineInfo
 
@@ -206,33 +244,34 @@ class profileFileReader(FileReader):
         i = 0
         for k, profile_pb in profile_dict.items():
             lineNum = initLineNum
-            for event in profile_pb.events:
-                if event.type == profiler_pb2.Event.CPU:
-                    if (k, event.device_id, "CPU") not in devices:
+            types, deviceIds = self._extract_events(profile_pb)[:2]
+            for eventType, deviceId in zip(types, deviceIds):
+                if eventType == profiler_pb2.Event.CPU:
+                    if (k, deviceId, "CPU") not in devices:
                         pid = initPid
                         initPid = initPid + 1
-                        devices[(k, event.device_id, "CPU")] = pid
+                        devices[(k, deviceId, "CPU")] = pid
                         # -1 device id represents CUDA API(RunTime) call.(e.g. cudaLaunch, cudaMemcpy)
-                        if event.device_id == -1:
+                        if deviceId == -1:
                             chrome_trace.emit_pid(
                                 f"{lineNum:02}_{k}:cuda_api", pid
                             )
                             lineNum = lineNum + 1
                         else:
                             chrome_trace.emit_pid(
-                                f"{lineNum:02}_{k}:cpu:block:{event.device_id}",
+                                f"{lineNum:02}_{k}:cpu:block:{deviceId}",
                                 pid,
                             )
                             lineNum = lineNum + 1
-                elif event.type == profiler_pb2.Event.GPUKernel:
-                    if (k, event.device_id, "GPUKernel") not in devices:
-                        if gpuId == event.device_id:
+                elif eventType == profiler_pb2.Event.GPUKernel:
+                    if (k, deviceId, "GPUKernel") not in devices:
+                        if gpuId == deviceId:
                             pid = initPid
                             initPid = initPid + 1
 
-                            devices[(k, event.device_id, "GPUKernel")] = pid
+                            devices[(k, deviceId, "GPUKernel")] = pid
                             chrome_trace.emit_pid(
-                                f"{lineNum:02}_{k}:gpu:{event.device_id}",
+                                f"{lineNum:02}_{k}:gpu:{deviceId}",
                                 pid,
                             )
                             lineNum = lineNum + 1
@@ -318,36 +357,58 @@ class profileFileReader(FileReader):
         for k, profile_pb in profile_dict.items():
             rankId = int(k.split(".")[-1])
 
-            for event in profile_pb.events:
-                if event.type == profiler_pb2.Event.CPU:
+            (
+                types,
+                deviceIds,
+                starts,
+                ends,
+                names,
+                memBytes,
+                subDeviceIds,
+                detailInfos,
+            ) = self._extract_events(profile_pb)
+            # Align the timestamps and compute the durations of all events
+            # at once instead of once per event inside the loop.
+            starts = np.asarray(starts, dtype=np.int64)
+            ends = np.asarray(ends, dtype=np.int64)
+            alignedList = self._align_ts(starts).tolist()
+            durList = (ends - starts).astype(np.float64).tolist()
+
+            records = []
+            for i, eventType in enumerate(types):
+                if eventType == profiler_pb2.Event.CPU:
                     type = "CPU"
-                elif event.type == profiler_pb2.Event.GPUKernel:
+                elif eventType == profiler_pb2.Event.GPUKernel:
                     type = "GPUKernel"
 
+                deviceId = deviceIds[i]
                 if (
-                    event.type == profiler_pb2.Event.GPUKernel
-                    and event.device_id != gpuId
+                    eventType == profiler_pb2.Event.GPUKernel
+                    and deviceId != gpuId
                     and rankId % self._gpuPerTrainer != gpuId
                 ):
                     continue
 
-                pid = devices[(k, event.device_id, type)]
-                args = {'name': event.name}
-                if event.memcopy.bytes > 0:
-                    args['mem_bytes'] = event.memcopy.bytes
-                if hasattr(event, "detail_info") and event.detail_info:
-                    args['detail_info'] = event.detail_info
+                pid = devices[(k, deviceId, type)]
+                args = {'name': names[i]}
+                if memBytes[i] > 0:
+                    args['mem_bytes'] = memBytes[i]
+                if detailInfos[i]:
+                    args['detail_info'] = detailInfos[i]
                 # TODO(panyx0718): Chrome tracing only handles ms. However, some
                 # ops takes micro-seconds. Hence, we keep the ns here.
-                chrome_trace.emit_region(
-                    self._align_ts(event.start_ns),
-                    (event.end_ns - event.start_ns) / 1.0,
-                    pid,
-                    event.sub_device_id,
-                    'Op',
-                    event.name,
-                    args,
+                records.append(
+                    (
+                        alignedList[i],
+                        durList[i],
+                        pid,
+                        subDeviceIds[i],
+                        'Op',
+                        names[i],
+                        args,
+                    )
                 )
+            chrome_trace.emit_regions(records)
         return chrome_trace
 
     def _allocate_memory_event(self, profile_dict, mem_devices, gpuId):
@@ -359,6 +420,13 @@ class profileFileReader(FileReader):
             profiler_pb2.MemEvent.CUDAPlace: "GPU",
             profiler_pb2.MemEvent.CUDAPinnedPlace: "CUDAPinnedPlace",
         }
+        # only the records of these places on other devices are skipped
+        device_places = frozenset(
+            {
+                profiler_pb2.MemEvent.CUDAPlace,
+                profiler_pb2.MemEvent.CUDAPinnedPlace,
+            }
+        )
         for k, profile_pb in profile_dict.items():
             rankId = int(k.split(".")[-1])
 
@@ -367,59 +435,59 @@ class profileFileReader(FileReader):
             if trainerId >= self._displaySize:
                 continue
 
-            mem_list = []
-            end_profiler = 0
+            startList = []
+            endList = []
+            sizeList = []
+            pidList = []
             for mevent in profile_pb.mem_events:
-                crt_info = {}
-                crt_info['time'] = mevent.start_ns
-                crt_info['size'] = mevent.bytes
-                if mevent.place in place_to_str:
-                    place = place_to_str[mevent.place]
-                else:
-                    place = "UnDefine"
-
-                if (
-                    mevent.place == profiler_pb2.MemEvent.CUDAPlace
-                    or mevent.place == profiler_pb2.MemEvent.CUDAPinnedPlace
-                ) and mevent.device_id != gpuId:
+                mplace = mevent.place
+                deviceId = mevent.device_id
+                if mplace in device_places and deviceId != gpuId:
                     continue
 
-                crt_info['place'] = place
-                pid = mem_devices[(k, mevent.device_id, place)]
-                crt_info['pid'] = pid
-                crt_info['thread_id'] = mevent.thread_id
-                crt_info['device_id'] = mevent.device_id
-                mem_list.append(crt_info)
-                crt_info = {}
-                crt_info['place'] = place
-                crt_info['pid'] = pid
-                crt_info['thread_id'] = mevent.thread_id
-                crt_info['device_id'] = mevent.device_id
-                crt_info['time'] = mevent.end_ns
-                crt_info['size'] = -mevent.bytes
-                mem_list.append(crt_info)
-                end_profiler = max(end_profiler, crt_info['time'])
-            mem_list.sort(key=lambda tmp: (tmp.get('time', 0)))
-            i = 0
-            total_size = 0
-            while i < len(mem_list):
-                total_size += mem_list[i]['size']
-                while (
-                    i < len(mem_list) - 1
-                    and mem_list[i]['time'] == mem_list[i + 1]['time']
-                ):
-                    total_size += mem_list[i + 1]['size']
-                    i += 1
+                place = place_to_str.get(mplace, "UnDefine")
+                startList.append(mevent.start_ns)
+                endList.append(mevent.end_ns)
+                sizeList.append(mevent.bytes)
+                pidList.append(mem_devices[(k, deviceId, place)])
+
+            if not sizeList:
+                continue
 
+            # Interleave the alloc (start, +bytes) and free (end, -bytes) of
+            # every event, so that the stable sort keeps the original order
+            # of records sharing a timestamp.
+            num = 2 * len(sizeList)
+            times = np.empty(num, dtype=np.int64)
+            times[0::2] = startList
+            times[1::2] = endList
+            sizes = np.empty(num, dtype=np.int64)
+            sizes[0::2] = sizeList
+            sizes[1::2] = sizes[0::2]
+            np.negative(sizes[1::2], out=sizes[1::2])
+            pids = np.repeat(np.asarray(pidList, dtype=np.int64), 2)
+
+            order = np.argsort(times, kind='stable')
+            times = times[order]
+            sizes = sizes[order]
+            pids = pids[order]
+
+            # One counter per unique timestamp, reported on the pid of the
+            # last record at that timestamp.
+            runStarts = np.concatenate(
+                ([0], np.flatnonzero(np.diff(times)) + 1)
+            )
+            runEnds = np.append(runStarts[1:] - 1, num - 1)
+            totalSizes = np.cumsum(np.add.reduceat(sizes, runStarts))
+
+            for pid, ts, total_size in zip(
+                pids[runEnds].tolist(),
+                self._align_ts(times[runStarts]).tolist(),
+                totalSizes.tolist(),
+            ):
                 chrome_trace.emit_counter(
-                    "Memory",
-                    "Memory",
-                    mem_list[i]['pid'],
-                    self._align_ts(mem_list[i]['time']),
-                    0,
-                    total_size,
+                    "Memory", "Memory", pid, ts, 0, total_size
                 )
-                i += 1
         return chrome_trace
 
     def _getOPTraceInfoByGpuId(self, groupId, gpuId):
@@ -446,6 +514,7 @@ class profileFileReader(FileReader):
         memEventsTrace = self._allocate_memory_event(
             profile_dict, mem_devicesPid, gpuId
         )
+        self._eventsCache.clear()
 
         trace = {}
         trace['traceEvents'] = (